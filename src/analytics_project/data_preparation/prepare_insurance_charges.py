@@ -32,11 +32,22 @@ which patient groups generate the highest medical costs.
 #####################################
 
 # Import from Python Standard Library
+from collections.abc import Iterator
 import pathlib
 import sys
 
 # Import from external packages (requires a virtual environment)
+import numpy as np
 import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Optional: numba compiles the fused risk-feature kernel (pip install analytics-project[perf])
+try:
+    from numba import njit, prange
+except ImportError:
+    njit = None
+    prange = range
 
 # Ensure project root is in sys.path for local imports (now 3 parents are needed)
 sys.path.append(str(pathlib.Path(__file__).resolve().parent.parent.parent))
@@ -44,9 +55,6 @@ sys.path.append(str(pathlib.Path(__file__).resolve().parent.parent.parent))
 # Import local modules (e.g. utils/logger.py)
 from utils.logger import logger
 
-# Optional: Use a data_scrubber module for common data cleaning tasks
-from utils.data_scrubber import DataScrubber
-
 
 # Constants
 SCRIPTS_DATA_PREP_DIR: pathlib.Path = pathlib.Path(__file__).resolve().parent
@@ -58,57 +66,160 @@ RAW_DATA_DIR: pathlib.Path = DATA_DIR / "raw"
 PREPARED_DATA_DIR: pathlib.Path = DATA_DIR / "prepared"
 ANALYTICS_PROJECT_DIR = SCRIPTS_DIR
 
+# Rows per chunk when streaming the raw CSV through the pipeline
+CHUNK_SIZE: int = 200_000
+
 # Ensure the directories exist or create them
 DATA_DIR.mkdir(exist_ok=True)
 RAW_DATA_DIR.mkdir(exist_ok=True)
 PREPARED_DATA_DIR.mkdir(exist_ok=True)
 
+# Explicit column types for insurance.csv. The label columns are typed while
+# parsing, so the reader never builds object columns for the strings. The
+# numeric columns are converted afterwards by convert_dtypes, which turns
+# empty or non-numeric values into missing values instead of failing the
+# whole read (handle_missing_values then drops those rows).
+SCHEMA: dict[str, str] = {
+    "age": "Int32",  # nullable until rows with a missing age are dropped
+    "children": "Int32",  # nullable, so missing values can still be filled with 0
+    "bmi": "float64",
+    "charges": "float64",
+    "sex": "category",
+    "smoker": "category",
+    "region": "category",
+}
+# Columns of SCHEMA typed by the CSV reader itself
+PARSE_DTYPE_COLUMNS = ["sex", "smoker", "region"]
+
+# Bin edges and labels for the derived risk features. Age bins are closed on
+# the right, (0, 29], (29, 39], ...; BMI bins are closed on the left,
+# [0, 18.5), [18.5, 25), ...
+AGE_EDGES = np.array([0, 29, 39, 49, 59, 120], dtype=np.int16)
+AGE_LABELS = ["18–29", "30–39", "40–49", "50–59", "60+"]
+BMI_EDGES = np.array([0, 18.5, 25.0, 30.0, 100.0], dtype=np.float64)
+BMI_LABELS = ["underweight/normal", "overweight", "obese", "extreme"]
+
+# Frames at least this long use the fused numba kernel in add_risk_features
+# (when numba is installed); smaller ones are not worth the thread start-up.
+FUSED_KERNEL_MIN_ROWS: int = 100_000
+
 #####################################
 # Define Functions - Reusable blocks of code / instructions
 #####################################
 
 
-def read_raw_data(file_name: str) -> pd.DataFrame:
+def _clean_name(col: object) -> str:
+    """Standardize one column name: strip, spaces to underscores, lowercase."""
+    return str(col).strip().replace(" ", "_").lower()
+
+
+def raw_columns(file_path: pathlib.Path) -> tuple[list[str], dict[str, str]]:
+    """
+    Return the raw header names of the SCHEMA columns and their parse dtypes.
+
+    Only the header line is read. Columns whose cleaned name is not in
+    SCHEMA are left out, so passing the names as `usecols` skips the others
+    at parse time, and messy headers (e.g. " Age") are still matched.
+    The dtypes cover PARSE_DTYPE_COLUMNS only (see SCHEMA).
     """
-    Read raw data from CSV located in data/raw.
+    header = pd.read_csv(file_path, nrows=0).columns
+    usecols = [col for col in header if _clean_name(col) in SCHEMA]
+    dtypes = {
+        col: SCHEMA[_clean_name(col)]
+        for col in usecols
+        if _clean_name(col) in PARSE_DTYPE_COLUMNS
+    }
+    return usecols, dtypes
+
+
+def iter_raw_chunks(file_name: str, chunksize: int = CHUNK_SIZE) -> Iterator[pd.DataFrame]:
+    """
+    Read raw data from CSV located in data/raw in chunks of `chunksize` rows.
+
+    Only the SCHEMA columns are parsed and the label columns arrive as
+    categories; convert_dtypes types the numeric ones.
+    The pyarrow engine does not support chunked reading, so the default
+    C engine is used here.
 
     Args:
         file_name: Name of the CSV file (e.g., "insurance.csv").
+        chunksize: Number of rows per chunk.
 
-    Returns:
-        A pandas DataFrame with the loaded data, or an empty
-        DataFrame if the file cannot be read.
+    Yields:
+        One pandas DataFrame per chunk.
     """
     file_path: pathlib.Path = RAW_DATA_DIR / file_name
-    try:
-        logger.info(f"READING: {file_path}")
-        df = pd.read_csv(file_path)
-        logger.info(f"Loaded dataframe with shape: {df.shape}")
-        return df
-    except FileNotFoundError:
-        logger.error(f"File not found: {file_path}")
-        return pd.DataFrame()
-    except Exception as e:  # noqa: BLE001
-        logger.error(f"Error reading {file_path}: {e}")
-        return pd.DataFrame()
+    logger.info(f"READING IN CHUNKS: {file_path} (chunksize={chunksize})")
+    usecols, dtypes = raw_columns(file_path)
+    yield from pd.read_csv(file_path, usecols=usecols, dtype=dtypes, chunksize=chunksize)
+
+
+def iter_spilled_chunks(file_name: str, chunksize: int = CHUNK_SIZE) -> Iterator[pd.DataFrame]:
+    """
+    Read cleaned data back from a Parquet file in data/prepared, in chunks.
+
+    The file keeps the pandas dtypes it was written with (see
+    write_parquet_chunk), so the chunks need no parsing or type conversion.
+    A file without rows still yields one empty chunk with its columns.
 
+    Args:
+        file_name: Name of the Parquet file (e.g., "insurance_cleaned.parquet").
+        chunksize: Number of rows per chunk.
 
-def save_prepared_data(df: pd.DataFrame, file_name: str) -> None:
+    Yields:
+        One pandas DataFrame per chunk.
+    """
+    parquet_file = pq.ParquetFile(PREPARED_DATA_DIR / file_name)
+    if parquet_file.metadata.num_rows == 0:
+        yield parquet_file.schema_arrow.empty_table().to_pandas()
+        return
+    for batch in parquet_file.iter_batches(batch_size=chunksize):
+        yield batch.to_pandas()
+
+
+def save_prepared_data(df: pd.DataFrame, file_name: str, append: bool = False) -> None:
     """
     Save prepared data to data/prepared.
 
     Args:
         df: Cleaned and enriched DataFrame.
         file_name: Output CSV file name (e.g., "insurance_prepared.csv").
+        append: If True, append rows to the file without writing the header.
     """
     logger.info(
         f"FUNCTION START: save_prepared_data with file_name={file_name}, dataframe shape={df.shape}"
     )
     file_path = PREPARED_DATA_DIR / file_name
-    df.to_csv(file_path, index=False)
+    df.to_csv(file_path, index=False, mode="a" if append else "w", header=not append)
     logger.info(f"Prepared data saved to {file_path}")
 
 
+def write_parquet_chunk(
+    df: pd.DataFrame, file_name: str, writer: pq.ParquetWriter | None = None
+) -> pq.ParquetWriter:
+    """
+    Append prepared data to a Parquet file in data/prepared.
+
+    Parquet keeps the column types (including categories), so later steps
+    can load the prepared data without re-parsing or re-inferring it.
+
+    Args:
+        df: Cleaned and enriched DataFrame (or chunk).
+        file_name: Output Parquet file name (e.g., "insurance_prepared.parquet").
+        writer: Writer returned by the previous call, or None to create the file.
+
+    Returns:
+        The writer to pass to the next call; close it after the last chunk.
+    """
+    table = pa.Table.from_pandas(df, preserve_index=False)
+    if writer is None:
+        file_path = PREPARED_DATA_DIR / file_name
+        writer = pq.ParquetWriter(file_path, table.schema, compression="zstd")
+        logger.info(f"Writing prepared Parquet data to {file_path}")
+    writer.write_table(table.cast(writer.schema))
+    return writer
+
+
 def clean_column_names(df: pd.DataFrame) -> pd.DataFrame:
     """
     Strip leading/trailing whitespace and standardize column names.
@@ -120,9 +231,8 @@ def clean_column_names(df: pd.DataFrame) -> pd.DataFrame:
     This helps avoid bugs later when referencing columns.
     """
     original_columns = df.columns.tolist()
-    df.columns = (
-        df.columns.str.strip().str.replace(" ", "_").str.lower()
-    )  # standardize
+    # A plain comprehension is cheaper than chained .str calls on a handful of names
+    df.columns = [_clean_name(col) for col in original_columns]  # standardize
     changed_columns = [
         f"{old} -> {new}"
         for old, new in zip(original_columns, df.columns)
@@ -133,64 +243,81 @@ def clean_column_names(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 
+def _normalize_cat(s: pd.Series) -> pd.Series:
+    """
+    Trim and lowercase a categorical column by working on its categories.
+
+    Only the (few) category labels are cleaned; rows keep their integer codes,
+    which are remapped when two labels collapse into the same cleaned value
+    (e.g. "Yes" and "yes ").
+    """
+    s = s.astype("category")
+    cleaned = s.cat.categories.astype(str).str.strip().str.lower()
+    uniques = cleaned.unique()
+    remap = uniques.get_indexer(cleaned)
+    codes = s.cat.codes.to_numpy()
+    new_codes = np.where(codes >= 0, remap[codes], -1)
+    return pd.Series(
+        pd.Categorical.from_codes(new_codes, categories=uniques),
+        index=s.index,
+        name=s.name,
+    )
+
+
 def convert_dtypes(df: pd.DataFrame) -> pd.DataFrame:
     """
     Ensure correct data types for key columns.
 
-    - age, children: Int64 (nullable integer)
+    - age, children: Int32 (nullable integer)
     - bmi, charges: float
-    - sex, smoker, region: standardized strings
+    - sex, smoker, region: standardized lowercase categories
 
-    This makes later analysis more reliable and explicit.
+    Empty or non-numeric values become missing values, which
+    handle_missing_values deals with. Numeric columns that already
+    have their SCHEMA dtype are left as they are.
     """
     logger.info("FUNCTION START: convert_dtypes")
 
     # Numeric columns
-    if "age" in df.columns:
-        df["age"] = pd.to_numeric(df["age"], errors="coerce").astype("Int64")
-        logger.info("Converted age to Int64.")
-
-    if "children" in df.columns:
-        df["children"] = pd.to_numeric(df["children"], errors="coerce").astype("Int64")
-        logger.info("Converted children to Int64.")
-
-    if "bmi" in df.columns:
-        df["bmi"] = pd.to_numeric(df["bmi"], errors="coerce")
-        logger.info("Converted bmi to numeric (float).")
-
-    if "charges" in df.columns:
-        df["charges"] = pd.to_numeric(df["charges"], errors="coerce")
-        logger.info("Converted charges to numeric (float).")
+    for col in ["age", "children", "bmi", "charges"]:
+        if col in df.columns and df[col].dtype != SCHEMA[col]:
+            df[col] = pd.to_numeric(df[col], errors="coerce").astype(SCHEMA[col])
+            logger.info(f"Converted {col} to {SCHEMA[col]}.")
 
     # Categorical columns: clean strings
     for col in ["sex", "smoker", "region"]:
         if col in df.columns:
-            df[col] = (
-                df[col]
-                .astype(str)
-                .str.strip()
-                .str.lower()
-            )
-            logger.info(f"Standardized {col} as lowercase string.")
+            df[col] = _normalize_cat(df[col])
+            logger.info(f"Standardized {col} as lowercase category.")
 
     return df
 
 
-def remove_duplicates(df: pd.DataFrame) -> pd.DataFrame:
+def drop_seen_duplicates(
+    df: pd.DataFrame, seen: np.ndarray
+) -> tuple[pd.DataFrame, np.ndarray]:
     """
-    Remove duplicate rows from the DataFrame.
+    Remove duplicate rows across chunks using a running set of row hashes.
 
-    For this dataset, there's no strict natural key,
-    so we let DataScrubber handle duplicate detection.
-    """
-    logger.info(f"FUNCTION START: remove_duplicates with dataframe shape={df.shape}")
+    A row is kept only if it is the first occurrence in this chunk and its
+    hash is not in `seen` (the hashes of rows kept from earlier chunks).
+    Duplicates within the chunk are found with pandas' hash table
+    (Series.duplicated, as in drop_duplicates) on one uint64 hash per row,
+    where the categories are hashed once and mapped through their codes.
+    `seen` stays sorted, so looking hashes up in it is a binary search.
 
-    df_scrubber = DataScrubber(df)
-    df_deduped = df_scrubber.remove_duplicate_records()
+    Returns:
+        The deduplicated chunk and the updated (sorted) array of seen hashes.
+    """
+    row_hashes = pd.util.hash_pandas_object(df, index=False)
+    keep = ~row_hashes.duplicated(keep="first").to_numpy()
+    hashes = row_hashes.to_numpy()
+    if seen.size:
+        pos = np.minimum(np.searchsorted(seen, hashes), seen.size - 1)
+        keep &= seen[pos] != hashes
 
-    logger.info(f"Original dataframe shape: {df.shape}")
-    logger.info(f"Deduped  dataframe shape: {df_deduped.shape}")
-    return df_deduped
+    logger.info(f"Removed {len(df) - keep.sum()} duplicate rows from chunk.")
+    return df.loc[keep], np.sort(np.concatenate([seen, hashes[keep]]))
 
 
 def handle_missing_values(df: pd.DataFrame) -> pd.DataFrame:
@@ -205,33 +332,54 @@ def handle_missing_values(df: pd.DataFrame) -> pd.DataFrame:
     """
     logger.info(f"FUNCTION START: handle_missing_values with dataframe shape={df.shape}")
 
-    missing_before = df.isna().sum().sum()
+    missing_before = int(df.isna().to_numpy().sum())
     logger.info(f"Total missing values before handling: {missing_before}")
 
-    key_cols = [c for c in ["age", "bmi", "smoker", "region", "charges"] if c in df.columns]
-    df = df.dropna(subset=key_cols)
+    # One boolean mask over all required fields, applied once.
+    # If sex is missing but charges etc. exist, we could keep it,
+    # but for simplicity we drop rows with missing sex if present.
+    required_cols = [
+        c for c in ["age", "bmi", "smoker", "region", "charges", "sex"] if c in df.columns
+    ]
+    keep = df[required_cols].notna().all(axis=1).to_numpy()
+    # Own copy of the kept rows, so filling children below does not write
+    # into the caller's frame (no chained assignment)
+    df = df.loc[keep].copy()
 
     if "children" in df.columns:
         df["children"] = df["children"].fillna(0)
 
-    # If sex is missing but charges etc. exist, we could keep it,
-    # but for simplicity we drop rows with missing sex if present.
-    if "sex" in df.columns:
-        df = df.dropna(subset=["sex"])
-
-    missing_after = df.isna().sum().sum()
+    missing_after = int(df.isna().to_numpy().sum())
     logger.info(f"Total missing values after handling: {missing_after}")
     logger.info(f"{len(df)} records remaining after handling missing values.")
     return df
 
 
-def remove_outliers(df: pd.DataFrame) -> pd.DataFrame:
+def charges_bounds(charges: np.ndarray) -> tuple[float, float]:
     """
-    Remove extreme outliers in charges using the IQR method.
+    Return the (lower, upper) bounds for charges using the IQR method.
 
     We use a relatively wide range (±3 * IQR) to avoid removing
     too many valid high-cost patients.
 
+    Both quartiles come from one np.nanquantile call (a single partition of
+    the array); missing values are ignored, as in pandas' quantile().
+    """
+    q1, q3 = np.nanquantile(charges, [0.25, 0.75])
+    iqr = q3 - q1
+    return q1 - 3 * iqr, q3 + 3 * iqr
+
+
+def remove_outliers(
+    df: pd.DataFrame, bounds: tuple[float, float] | None = None
+) -> pd.DataFrame:
+    """
+    Remove extreme outliers in charges using the IQR method.
+
+    By default the bounds come from this DataFrame (see charges_bounds).
+    When processing in chunks, pass the `bounds` computed over the whole
+    file instead, so every chunk is filtered the same way.
+
     Negative values, if any, are removed automatically by the IQR filter.
     """
     logger.info(f"FUNCTION START: remove_outliers with dataframe shape={df.shape}")
@@ -242,14 +390,11 @@ def remove_outliers(df: pd.DataFrame) -> pd.DataFrame:
 
     initial_count = len(df)
 
-    q1 = df["charges"].quantile(0.25)
-    q3 = df["charges"].quantile(0.75)
-    iqr = q3 - q1
-
-    lower = q1 - 3 * iqr
-    upper = q3 + 3 * iqr
+    charges = df["charges"].to_numpy(dtype=np.float64, na_value=np.nan)
+    lower, upper = bounds if bounds is not None else charges_bounds(charges)
 
-    df = df[(df["charges"] >= lower) & (df["charges"] <= upper)]
+    # Own copy of the kept rows, so callers can add columns to it
+    df = df.loc[(charges >= lower) & (charges <= upper)].copy()
 
     removed_count = initial_count - len(df)
     logger.info(f"Removed {removed_count} outlier rows based on charges.")
@@ -257,6 +402,126 @@ def remove_outliers(df: pd.DataFrame) -> pd.DataFrame:
     return df
 
 
+def downcast(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Shrink columns to the smallest dtype that holds their values safely.
+
+    - age, children: smallest unsigned integer (uint8 for this dataset);
+      missing children are filled with 0 first
+    - sex, smoker, region, age_group, bmi_category: category
+    - bmi, charges: kept as float64, since float32 would change the values
+      written to the data warehouse
+
+    Integers are only downcast when every value fits, so nothing wraps around.
+    """
+    logger.info("FUNCTION START: downcast")
+
+    if "age" in df.columns:
+        # Rows with a missing age are already dropped, so the nullable
+        # Int32 can become a plain unsigned integer
+        df["age"] = pd.to_numeric(df["age"].astype("int64"), downcast="unsigned")
+
+    if "children" in df.columns:
+        df["children"] = pd.to_numeric(df["children"].fillna(0), downcast="unsigned")
+
+    for col in ["sex", "smoker", "region", "age_group", "bmi_category"]:
+        if col in df.columns and not isinstance(df[col].dtype, pd.CategoricalDtype):
+            df[col] = df[col].astype("category")
+
+    return df
+
+
+def _bin_codes(values: np.ndarray, edges: np.ndarray, side: str) -> np.ndarray:
+    """
+    Return int8 bin codes for values, or -1 where a value falls outside the edges.
+
+    side="left" gives right-closed bins and side="right" gives left-closed
+    bins, matching pd.cut(right=True) and pd.cut(right=False) respectively.
+    """
+    codes = np.searchsorted(edges, values, side=side) - 1
+    return np.where((codes >= 0) & (codes < len(edges) - 1), codes, -1).astype(np.int8)
+
+
+def _risk_codes_loop(
+    age: np.ndarray,
+    bmi: np.ndarray,
+    smoker_code: np.ndarray,
+    age_edges: np.ndarray,
+    bmi_edges: np.ndarray,
+    out_age: np.ndarray,
+    out_bmi: np.ndarray,
+    out_flag: np.ndarray,
+) -> None:
+    """
+    Fill age_group, bmi_category and smoker_flag codes in a single pass.
+
+    Same bins as _bin_codes: age bins are closed on the right, BMI bins on
+    the left, and values outside the edges (or NaN) get -1. The smoker code
+    (0 = no, 1 = yes, -1 = other) is the flag.
+    """
+    n_age_bins = age_edges.size - 1
+    n_bmi_bins = bmi_edges.size - 1
+    for i in prange(age.size):
+        a = age[i]
+        out_age[i] = -1
+        for j in range(n_age_bins):
+            if age_edges[j] < a <= age_edges[j + 1]:
+                out_age[i] = j
+                break
+
+        b = bmi[i]
+        out_bmi[i] = -1
+        for j in range(n_bmi_bins):
+            if bmi_edges[j] <= b < bmi_edges[j + 1]:
+                out_bmi[i] = j
+                break
+
+        out_flag[i] = smoker_code[i]
+
+
+_risk_kernel = (
+    njit(parallel=True, cache=True)(_risk_codes_loop) if njit is not None else None
+)
+
+
+def _smoker_codes(smoker: pd.Series) -> pd.Series:
+    """
+    Return smoker category codes with categories fixed to ["no", "yes"].
+
+    The code is the smoker flag; anything else (or missing) gets -1.
+    """
+    return smoker.astype("category").cat.set_categories(["no", "yes"]).cat.codes
+
+
+def _add_risk_features_fused(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Add age_group, bmi_category and smoker_flag with the fused numba kernel.
+
+    One parallel pass reads age, bmi and the smoker code of each row and
+    writes all three codes, instead of three separate column passes.
+    """
+    n = len(df)
+    out_age = np.empty(n, dtype=np.int8)
+    out_bmi = np.empty(n, dtype=np.int8)
+    out_flag = np.empty(n, dtype=np.int8)
+    _risk_kernel(
+        df["age"].to_numpy(),
+        df["bmi"].to_numpy(dtype=np.float64, na_value=np.nan),
+        _smoker_codes(df["smoker"]).to_numpy(),
+        AGE_EDGES,
+        BMI_EDGES,
+        out_age,
+        out_bmi,
+        out_flag,
+    )
+
+    df["age_group"] = pd.Categorical.from_codes(out_age, categories=AGE_LABELS)
+    df["bmi_category"] = pd.Categorical.from_codes(out_bmi, categories=BMI_LABELS)
+    df["smoker_flag"] = pd.Series(out_flag, index=df.index, dtype="Int8").mask(out_flag < 0)
+    logger.info("Added age_group, bmi_category and smoker_flag features (fused kernel).")
+    return df
+
+
 def add_risk_features(df: pd.DataFrame) -> pd.DataFrame:
     """
     Add derived features useful for BI analysis:
@@ -264,32 +529,34 @@ def add_risk_features(df: pd.DataFrame) -> pd.DataFrame:
     - age_group: bins (e.g., 18–29, 30–39, 40–49, 50–59, 60+)
     - bmi_category: underweight, normal, overweight, obese (rough cut)
     - smoker_flag: 1 for smokers, 0 otherwise
+
+    Large frames are handled by a fused numba kernel when numba is installed.
     """
     logger.info("FUNCTION START: add_risk_features")
 
+    if (
+        _risk_kernel is not None
+        and len(df) >= FUSED_KERNEL_MIN_ROWS
+        and all(c in df.columns for c in ["age", "bmi", "smoker"])
+    ):
+        return _add_risk_features_fused(df)
+
     # age_group
     if "age" in df.columns:
-        df["age_group"] = pd.cut(
-            df["age"].astype("float"),
-            bins=[0, 29, 39, 49, 59, 120],
-            labels=["18–29", "30–39", "40–49", "50–59", "60+"],
-            right=True,
-        )
+        codes = _bin_codes(df["age"].to_numpy(), AGE_EDGES, side="left")
+        df["age_group"] = pd.Categorical.from_codes(codes, categories=AGE_LABELS)
         logger.info("Added age_group feature.")
 
     # bmi_category
     if "bmi" in df.columns:
-        df["bmi_category"] = pd.cut(
-            df["bmi"],
-            bins=[0, 18.5, 25, 30, 100],
-            labels=["underweight/normal", "overweight", "obese", "extreme"],
-            right=False,
-        )
+        codes = _bin_codes(df["bmi"].to_numpy(), BMI_EDGES, side="right")
+        df["bmi_category"] = pd.Categorical.from_codes(codes, categories=BMI_LABELS)
         logger.info("Added bmi_category feature.")
 
     # smoker_flag
     if "smoker" in df.columns:
-        df["smoker_flag"] = df["smoker"].map({"yes": 1, "no": 0})
+        codes = _smoker_codes(df["smoker"])
+        df["smoker_flag"] = codes.astype("Int8").mask(codes < 0)
         logger.info("Added smoker_flag feature.")
 
     return df
@@ -300,18 +567,85 @@ def add_risk_features(df: pd.DataFrame) -> pd.DataFrame:
 #####################################
 
 
+def clean_chunk(df: pd.DataFrame, seen: np.ndarray) -> tuple[pd.DataFrame, np.ndarray]:
+    """
+    Run the cleaning steps on one chunk.
+
+    Cleans column names, converts data types, removes duplicates (also
+    across chunks, see drop_seen_duplicates) and handles missing values.
+    Columns keep their SCHEMA dtypes; downcast is left to the caller.
+
+    Duplicates are removed before missing values are handled, as in the
+    original pipeline: filling missing children with 0 would otherwise
+    turn rows that differ only in NaN vs 0 children into duplicates.
+    Outliers are removed later, once the bounds are known; duplicate rows
+    have the same charges, so that order does not change the result.
+
+    Returns:
+        The cleaned chunk and the updated array of seen row hashes.
+    """
+    df = clean_column_names(df)
+    df = convert_dtypes(df)
+    df, seen = drop_seen_duplicates(df, seen)
+    df = handle_missing_values(df)
+    return df, seen
+
+
+def clean_and_spill(file_name: str, spill_file: str) -> tuple[tuple[float, float], int]:
+    """
+    First pass over the raw file: clean it and compute the charges outlier bounds.
+
+    Each chunk is cleaned (see clean_chunk) and appended to `spill_file`
+    in data/prepared, so the second pass reads typed, deduplicated rows
+    instead of parsing and cleaning the CSV again. The charges of the
+    cleaned rows are collected for the bounds, so they match what
+    remove_outliers would compute on the whole cleaned dataset.
+
+    Returns:
+        The (lower, upper) bounds, NaN when no row is left after cleaning,
+        and the number of raw rows read.
+    """
+    seen = np.empty(0, dtype=np.uint64)
+    charges: list[np.ndarray] = []
+    raw_rows = 0
+    spill_writer: pq.ParquetWriter | None = None
+    try:
+        for chunk in iter_raw_chunks(file_name):
+            raw_rows += len(chunk)
+            chunk, seen = clean_chunk(chunk, seen)
+            charges.append(chunk["charges"].to_numpy(dtype=np.float64, na_value=np.nan))
+            spill_writer = write_parquet_chunk(chunk, spill_file, spill_writer)
+    finally:
+        if spill_writer is not None:
+            spill_writer.close()
+
+    all_charges = np.concatenate(charges) if charges else np.empty(0)
+    if all_charges.size == 0:
+        return (np.nan, np.nan), raw_rows
+    return charges_bounds(all_charges), raw_rows
+
+
 def main() -> None:
     """
     Main entry point for processing insurance charges data.
 
+    The raw file is read in chunks of CHUNK_SIZE rows, so the full
+    dataset is never held as one DataFrame. Memory still grows with the
+    number of rows, by about 16 bytes per cleaned row: the row hashes kept
+    for cross-chunk deduplication and the charges used for the bounds.
+
     Steps:
-    1. Read raw insurance.csv from data/raw.
-    2. Clean column names and convert data types.
-    3. Remove duplicate records.
-    4. Handle missing values.
-    5. Remove extreme outliers in charges.
-    6. Add derived risk-related features.
-    7. Save prepared data to data/prepared/insurance_prepared.csv.
+    1. First pass, for each chunk of raw insurance.csv from data/raw:
+       a. Clean column names and convert data types.
+       b. Remove duplicate records (also across chunks).
+       c. Handle missing values.
+       d. Spill the cleaned chunk to a temporary Parquet file.
+       Then compute the charges outlier bounds over the cleaned data.
+    2. Second pass, for each chunk of the spilled file:
+       a. Remove extreme outliers in charges using the global bounds.
+       b. Add derived risk-related features and downcast to compact dtypes.
+       c. Append the chunk to data/prepared/insurance_prepared.csv
+          and data/prepared/insurance_prepared.parquet.
     """
     logger.info("============================================")
     logger.info("STARTING prepare_insurance_charges.py")
@@ -325,31 +659,46 @@ def main() -> None:
 
     input_file = "insurance.csv"
     output_file = "insurance_prepared.csv"
+    parquet_file = "insurance_prepared.parquet"
 
-    df = read_raw_data(input_file)
-    original_shape = df.shape
-    logger.info(f"Initial dataframe shape: {original_shape}")
-    logger.info(
-        f"Initial dataframe columns: {', '.join(df.columns.astype(str).tolist())}"
-    )
-
-    if df.empty:
-        logger.error("Dataframe is empty. Exiting script.")
-        return
-
-    # Preparation pipeline
-    df = clean_column_names(df)
-    df = convert_dtypes(df)
-    df = remove_duplicates(df)
-    df = handle_missing_values(df)
-    df = remove_outliers(df)
-    df = add_risk_features(df)
+    spill_file = "insurance_cleaned.tmp.parquet"
 
-    save_prepared_data(df, output_file)
+    try:
+        try:
+            bounds, raw_rows = clean_and_spill(input_file, spill_file)
+        except FileNotFoundError:
+            logger.error(f"File not found: {RAW_DATA_DIR / input_file}")
+            return
+
+        logger.info(f"Initial row count: {raw_rows}")
+        if raw_rows == 0:
+            logger.error("Dataframe is empty. Exiting script.")
+            return
+        if np.isnan(bounds[0]):
+            logger.warning("No rows left after cleaning. The prepared data will be empty.")
+        else:
+            logger.info(f"Charges bounds (±3 * IQR): [{bounds[0]:.2f}, {bounds[1]:.2f}]")
+
+        # Second pass over the cleaned rows, one chunk at a time
+        cleaned_rows = 0
+        parquet_writer: pq.ParquetWriter | None = None
+        try:
+            for i, chunk in enumerate(iter_spilled_chunks(spill_file)):
+                chunk = remove_outliers(chunk, bounds=bounds)
+                chunk = downcast(add_risk_features(chunk))
+
+                save_prepared_data(chunk, output_file, append=i > 0)
+                parquet_writer = write_parquet_chunk(chunk, parquet_file, parquet_writer)
+                cleaned_rows += len(chunk)
+        finally:
+            if parquet_writer is not None:
+                parquet_writer.close()
+    finally:
+        (PREPARED_DATA_DIR / spill_file).unlink(missing_ok=True)
 
     logger.info("============================================")
-    logger.info(f"Original shape: {original_shape}")
-    logger.info(f"Cleaned shape:  {df.shape}")
+    logger.info(f"Original rows: {raw_rows}")
+    logger.info(f"Cleaned rows:  {cleaned_rows}")
     logger.info("FINISHED prepare_insurance_charges.py")
     logger.info("============================================")
 
@@ -0,0 +1,204 @@
+"""
+analytics_project/data_preparation/prepare_polars.py
+
+Polars version of prepare_insurance_charges.py.
+
+This script runs the same preparation steps as the pandas script
+(clean names, convert types, remove duplicates, handle missing values,
+remove outliers, add risk features) but expresses them as one lazy Polars
+query. Polars fuses the steps, pushes filters down into the CSV scan,
+and streams the result to disk instead of building a new DataFrame
+after every step.
+
+Two passes over the raw file are needed:
+1. Compute the IQR bounds for charges on the cleaned rows.
+2. Filter with those bounds, add the features, and stream the result
+   to data/prepared/insurance_prepared.csv.
+
+Requires the optional `polars` package (pip install analytics-project[perf]).
+"""
+
+#####################################
+# Import Modules at the Top
+#####################################
+
+# Import from Python Standard Library
+import pathlib
+import sys
+
+# Import from external packages (requires a virtual environment)
+import polars as pl
+
+# Ensure project root is in sys.path for local imports (now 3 parents are needed)
+sys.path.append(str(pathlib.Path(__file__).resolve().parent.parent.parent))
+
+# Import local modules (e.g. utils/logger.py)
+from utils.logger import logger
+
+# Constants
+SCRIPTS_DATA_PREP_DIR: pathlib.Path = pathlib.Path(__file__).resolve().parent
+SCRIPTS_DIR: pathlib.Path = SCRIPTS_DATA_PREP_DIR.parent
+SRC_DIR: pathlib.Path = SCRIPTS_DIR.parent
+PROJECT_ROOT: pathlib.Path = SRC_DIR.parent
+DATA_DIR: pathlib.Path = PROJECT_ROOT / "data"
+RAW_DATA_DIR: pathlib.Path = DATA_DIR / "raw"
+PREPARED_DATA_DIR: pathlib.Path = DATA_DIR / "prepared"
+
+# Ensure the directories exist or create them
+DATA_DIR.mkdir(exist_ok=True)
+RAW_DATA_DIR.mkdir(exist_ok=True)
+PREPARED_DATA_DIR.mkdir(exist_ok=True)
+
+# Same types as SCHEMA in prepare_insurance_charges.py
+NUMERIC_SCHEMA: dict[str, pl.DataType] = {
+    "age": pl.Int32(),
+    "children": pl.Int32(),
+    "bmi": pl.Float64(),
+    "charges": pl.Float64(),
+}
+CATEGORY_COLUMNS = ["sex", "smoker", "region"]
+KEY_COLUMNS = ["age", "bmi", "smoker", "region", "charges", "sex"]
+
+#####################################
+# Define Functions - Reusable blocks of code / instructions
+#####################################
+
+
+def scan_clean_data(file_path: pathlib.Path) -> pl.LazyFrame:
+    """
+    Build the lazy query for everything up to (not including) outlier removal.
+
+    - Clean column names and convert data types. Numbers are parsed as
+      Float64 first, so integer columns written as floats (e.g. "19.0",
+      as pandas writes an int column with missing values) are kept;
+      unparseable values become null, like pd.to_numeric(errors="coerce").
+    - Remove duplicate records (first occurrence wins, order is kept).
+    - Drop rows with missing key fields and fill missing children with 0.
+    """
+    lf = pl.scan_csv(file_path, infer_schema=False).rename(
+        lambda c: c.strip().replace(" ", "_").lower()
+    )
+    columns = lf.collect_schema().names()
+
+    lf = lf.with_columns(
+        [
+            pl.col(col).cast(pl.Float64, strict=False).cast(dtype, strict=False)
+            for col, dtype in NUMERIC_SCHEMA.items()
+            if col in columns
+        ]
+        + [
+            pl.col(col).str.strip_chars().str.to_lowercase()
+            for col in CATEGORY_COLUMNS
+            if col in columns
+        ]
+    )
+
+    lf = lf.unique(keep="first", maintain_order=True)
+    lf = lf.drop_nulls(subset=[c for c in KEY_COLUMNS if c in columns])
+    if "children" in columns:
+        lf = lf.with_columns(pl.col("children").fill_null(0))
+    return lf
+
+
+def compute_charges_bounds(lf: pl.LazyFrame) -> tuple[float, float] | None:
+    """
+    Compute the (lower, upper) charges bounds using ±3 * IQR.
+
+    Uses linear interpolation so the bounds match pandas' quantile().
+    Returns None when no row is left to compute them from.
+    """
+    quartiles = lf.select(
+        pl.col("charges").quantile(0.25, interpolation="linear").alias("q1"),
+        pl.col("charges").quantile(0.75, interpolation="linear").alias("q3"),
+    ).collect()
+    q1, q3 = quartiles.row(0)
+    if q1 is None:
+        return None
+    iqr = q3 - q1
+    return q1 - 3 * iqr, q3 + 3 * iqr
+
+
+def risk_feature_expressions() -> list[pl.Expr]:
+    """
+    Return expressions for age_group, bmi_category and smoker_flag.
+
+    Bins match add_risk_features() in prepare_insurance_charges.py:
+    age bins are closed on the right, BMI bins are closed on the left,
+    and values outside the bins are left null.
+    """
+    age = pl.col("age")
+    age_group = (
+        pl.when((age > 0) & (age <= 29)).then(pl.lit("18–29"))
+        .when((age > 29) & (age <= 39)).then(pl.lit("30–39"))
+        .when((age > 39) & (age <= 49)).then(pl.lit("40–49"))
+        .when((age > 49) & (age <= 59)).then(pl.lit("50–59"))
+        .when((age > 59) & (age <= 120)).then(pl.lit("60+"))
+        .alias("age_group")
+    )
+
+    bmi = pl.col("bmi")
+    bmi_category = (
+        pl.when((bmi >= 0) & (bmi < 18.5)).then(pl.lit("underweight/normal"))
+        .when((bmi >= 18.5) & (bmi < 25)).then(pl.lit("overweight"))
+        .when((bmi >= 25) & (bmi < 30)).then(pl.lit("obese"))
+        .when((bmi >= 30) & (bmi < 100)).then(pl.lit("extreme"))
+        .alias("bmi_category")
+    )
+
+    smoker = pl.col("smoker")
+    smoker_flag = (
+        pl.when(smoker == "yes").then(pl.lit(1, dtype=pl.Int8))
+        .when(smoker == "no").then(pl.lit(0, dtype=pl.Int8))
+        .alias("smoker_flag")
+    )
+    return [age_group, bmi_category, smoker_flag]
+
+
+#####################################
+# Main
+#####################################
+
+
+def main() -> None:
+    """
+    Main entry point for processing insurance charges data with Polars.
+
+    Steps:
+    1. Lazily scan raw insurance.csv from data/raw.
+    2. Clean names and types, remove duplicates, handle missing values.
+    3. Compute the charges IQR bounds (first pass).
+    4. Remove extreme outliers and add risk features (second pass).
+    5. Stream the prepared data to data/prepared/insurance_prepared.csv.
+    """
+    logger.info("============================================")
+    logger.info("STARTING prepare_polars.py")
+    logger.info("============================================")
+
+    input_path = RAW_DATA_DIR / "insurance.csv"
+    output_path = PREPARED_DATA_DIR / "insurance_prepared.csv"
+
+    if not input_path.exists():
+        logger.error(f"File not found: {input_path}")
+        return
+
+    lf = scan_clean_data(input_path)
+
+    bounds = compute_charges_bounds(lf)
+    if bounds is None:
+        logger.error("Dataframe is empty. Exiting script.")
+        return
+    lower, upper = bounds
+    logger.info(f"Charges bounds (±3 * IQR): [{lower:.2f}, {upper:.2f}]")
+
+    lf = lf.filter(pl.col("charges").is_between(lower, upper)).with_columns(
+        risk_feature_expressions()
+    )
+    lf.sink_csv(output_path)
+
+    logger.info(f"Prepared data saved to {output_path}")
+    logger.info("FINISHED prepare_polars.py")
+    logger.info("============================================")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,8 +1,38 @@
+import numpy as np
 import pandas as pd
+import contextlib
+import functools
 import pathlib
 import sqlite3
+import sys
+from collections.abc import Callable, Iterator
+from concurrent.futures import Future, ThreadPoolExecutor
 from loguru import logger  
 
+try:
+    import duckdb  # optional: pip install analytics-project[perf]
+except ImportError:
+    duckdb = None
+
+try:
+    import polars as pl  # optional: pip install analytics-project[perf]
+except ImportError:
+    pl = None
+
+# Optional: numba compiles the grouped aggregation kernel (pip install analytics-project[perf])
+try:
+    from numba import get_num_threads, njit, prange
+except ImportError:
+    njit = None
+    prange = range
+
+# Optional: numpy-groupies grouped aggregation, numba-backed when numba is
+# installed (pip install analytics-project[perf])
+try:
+    import numpy_groupies as npg
+except ImportError:
+    npg = None
+
 # --- 1. Path Configuration ---
 THIS_DIR: pathlib.Path = pathlib.Path(__file__).resolve().parent
 PACKAGE_DIR: pathlib.Path = THIS_DIR.parent
@@ -14,29 +44,200 @@ WAREHOUSE_DIR: pathlib.Path = DATA_DIR / "dw"
 # ✅ Data warehouse for your insurance project
 DB_PATH: pathlib.Path = WAREHOUSE_DIR / "insurance_dw.db"
 OLAP_OUTPUT_DIR: pathlib.Path = DATA_DIR / "olap_cubing_outputs"
+# Parquet copies of DW tables, refreshed whenever the database changes
+DW_CACHE_DIR: pathlib.Path = DATA_DIR / "dw_cache"
+
+# Dimension tables joined to fact_insurance_charges, with their surrogate key
+DIMENSION_TABLES: dict[str, str] = {
+    "dim_demographics": "demographics_key",
+    "dim_region": "region_key",
+    "dim_risk": "risk_key",
+}
+
+# pandas aggregation names and their SQLite equivalents
+SQL_AGGREGATES: dict[str, str] = {
+    "sum": "SUM",
+    "mean": "AVG",
+    "count": "COUNT",
+    "min": "MIN",
+    "max": "MAX",
+}
+
+# How each aggregate is rolled up from a finer cube to a coarser one
+# (a mean is rebuilt from its sum and count, see _rollup_metrics)
+ROLLUP_AGGREGATES: dict[str, str] = {
+    "sum": "sum",
+    "count": "sum",
+    "min": "min",
+    "max": "max",
+}
+
+# Data marts at least this long are aggregated by the numba kernel in
+# create_olap_cube (when numba is installed); smaller ones are not worth
+# the thread start-up.
+NUMBA_CUBE_MIN_ROWS: int = 100_000
+# The dense paths keep one accumulator per combination of dimension
+# categories, so they are only used while that product stays small. The
+# numba kernel keeps one copy per thread, so it is held to this many groups
+# times threads and falls back to numpy-groupies / np.bincount above that.
+DENSE_CUBE_MAX_GROUPS: int = 1 << 20
+# Aggregations the dense paths compute
+DENSE_AGGREGATES: frozenset = frozenset({"sum", "mean", "count"})
+
+# DW tables are read into Arrow-backed columns (no per-cell Python objects)
+DTYPE_BACKEND: str = "pyarrow"
+
+# Leaf cube materialized next to the DW, and the table recording what it was
+# built from. They live in a database of their own: writing them into the DW
+# file would bump its mtime and invalidate the Parquet cache (_cache_is_fresh).
+MV_DB_PATH: pathlib.Path = WAREHOUSE_DIR / "insurance_mv.db"
+MV_TABLE: str = "mv_insurance_cube_leaf"
+MV_METADATA_TABLE: str = "mv_metadata"
+
+# Engines main() can compute the cube with
+OLAP_ENGINES: tuple[str, ...] = ("sqlite", "pandas", "duckdb", "polars")
+
+# Rows per fact-table chunk in create_olap_cube_chunked
+FACT_CHUNK_SIZE: int = 200_000
 
 # Create the output directory if it does not exist
 OLAP_OUTPUT_DIR.mkdir(parents=True, exist_ok=True)
 
-# Simple Loguru configuration
+# Simple Loguru configuration: log to stderr, colored only on a terminal;
+# records are formatted and written by a background thread (enqueue=True)
 logger.remove()
 logger.add(
-    lambda msg: print(msg, end=""),
+    sys.stderr,
     level="INFO",
     format="{time:YYYY-MM-DD HH:mm:ss.SSS} | {level: <8} | {name}:{function}:{line} - {message}",
-    colorize=True,
+    colorize=sys.stderr.isatty(),
+    enqueue=True,
 )
 # --- End Configuration ---
 
+# Connection settings for cube queries: GROUP BY sorts and temp B-trees
+# stay in RAM, the page cache can hold up to 256 MiB, and up to 256 MiB of
+# the file is memory-mapped instead of copied through read() calls.
+# journal_mode/synchronous are left alone: this module only reads, and
+# switching the file to WAL would persist and clash with the ETL's
+# exclusive bulk-load settings.
+OLAP_PRAGMAS: tuple[str, ...] = (
+    "PRAGMA temp_store=MEMORY",
+    "PRAGMA cache_size=-262144",
+    "PRAGMA mmap_size=268435456",
+)
+
+# Shared connection to the DW, opened on first use (see _get_conn)
+_CONN: sqlite3.Connection | None = None
+
+# Cube SQL already built, keyed by (dimensions, metrics) (see _cube_sql)
+_stmt_cache: dict[tuple, str] = {}
+
+
+def _get_conn() -> sqlite3.Connection:
+    """
+    Return the shared SQLite connection to the data warehouse.
+
+    The connection is opened on first use and then reused by every read in
+    this module, so SQLite's page cache stays warm between queries.
+    OLAP_PRAGMAS are applied once when it is opened. The connection is in
+    autocommit mode (isolation_level=None), so reads never hold a
+    transaction open between queries.
+    """
+    global _CONN
+    if _CONN is None:
+        _CONN = _connect()
+    return _CONN
+
+
+def _connect() -> sqlite3.Connection:
+    """Open a new autocommit connection to the DW with OLAP_PRAGMAS applied."""
+    conn = sqlite3.connect(DB_PATH, isolation_level=None, check_same_thread=False)
+    for pragma in OLAP_PRAGMAS:
+        conn.execute(pragma)
+    return conn
+
+
+def _with_own_conn(func: Callable, *args, **kwargs):
+    """
+    Call func(*args, conn=..., **kwargs) on a connection of its own.
+
+    Used for loads running on worker threads: a sqlite3 connection must not
+    be used by two threads at once, so each load opens and closes its own.
+    """
+    with contextlib.closing(_connect()) as conn:
+        return func(*args, conn=conn, **kwargs)
+
+
+def _cache_is_fresh(cache_path: pathlib.Path) -> bool:
+    """Return True when a cached table file is at least as new as the database file."""
+    return (
+        cache_path.exists()
+        and DB_PATH.exists()
+        and cache_path.stat().st_mtime >= DB_PATH.stat().st_mtime
+    )
+
+
+def read_dw_table(
+    table_name: str,
+    conn: sqlite3.Connection | None = None,
+    columns: list | None = None,
+) -> pd.DataFrame:
+    """
+    Read a DW table, using a Parquet cache under data/dw_cache/.
+
+    Columns are Arrow-backed (DTYPE_BACKEND), from SQLite and from Parquet.
+
+    The cached copy is used while it is at least as new as the database file;
+    otherwise the whole table is read from SQLite (through conn, or the
+    shared connection by default) and the cache is rewritten.
 
-def ingest_fact_insurance_from_dw() -> pd.DataFrame:
+    With columns set, only those columns are returned. They are read from
+    Parquet on a cache hit; on a miss the full table is still read once so
+    the cache is filled, and the columns are selected afterwards.
+    """
+    cache_path = DW_CACHE_DIR / f"{table_name}.parquet"
+    if _cache_is_fresh(cache_path):
+        logger.info(f"Reading {table_name} from cache {cache_path}.")
+        return pd.read_parquet(
+            cache_path, engine="pyarrow", columns=columns, dtype_backend=DTYPE_BACKEND
+        )
+
+    df = pd.read_sql_query(
+        f"SELECT * FROM {table_name}", conn or _get_conn(), dtype_backend=DTYPE_BACKEND
+    )
+    DW_CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    df.to_parquet(cache_path, engine="pyarrow", index=False)
+    return df[columns] if columns else df
+
+
+def ingest_fact_insurance_from_dw(
+    chunksize: int | None = None,
+    conn: sqlite3.Connection | None = None,
+    columns: list | None = None,
+) -> pd.DataFrame | Iterator[pd.DataFrame]:
     """
     Load the fact table (fact_insurance_charges) from the SQLite data warehouse.
+
+    Reads go through conn, or the shared connection (_get_conn) by default.
+    With columns set, only those fact columns are read.
+
+    With chunksize set, an iterator of DataFrames of at most chunksize rows
+    is returned instead, read straight from SQLite, so the whole fact table
+    is never in memory at once (see create_olap_cube_chunked).
     """
+    if chunksize is not None:
+        logger.info(f"Streaming fact_insurance_charges in chunks of {chunksize} rows.\n")
+        column_list = ", ".join(columns) if columns else "*"
+        return pd.read_sql_query(
+            f"SELECT {column_list} FROM fact_insurance_charges",
+            conn or _get_conn(),
+            chunksize=chunksize,
+            dtype_backend=DTYPE_BACKEND,
+        )
+
     try:
-        conn = sqlite3.connect(DB_PATH)
-        fact_df = pd.read_sql_query("SELECT * FROM fact_insurance_charges", conn)
-        conn.close()
+        fact_df = read_dw_table("fact_insurance_charges", conn, columns)
         logger.info("fact_insurance_charges successfully loaded from SQLite data warehouse.\n")
         return fact_df
     except sqlite3.OperationalError as e:
@@ -47,14 +248,24 @@ def ingest_fact_insurance_from_dw() -> pd.DataFrame:
         raise
 
 
-def ingest_dim_table(table_name: str) -> pd.DataFrame:
+def ingest_dim_table(
+    table_name: str,
+    conn: sqlite3.Connection | None = None,
+    columns: list | None = None,
+) -> pd.DataFrame:
     """
     Load a dimension table (e.g., dim_demographics, dim_region, dim_risk) from the DW.
+
+    Reads go through conn, or the shared connection (_get_conn) by default.
+    With columns set, only those columns are read (include the table's key).
+
+    Text columns are returned as categories, so joins carry small integer
+    codes into the fact rows and the cube groupby does not hash strings.
     """
     try:
-        conn = sqlite3.connect(DB_PATH)
-        df = pd.read_sql_query(f"SELECT * FROM {table_name}", conn)
-        conn.close()
+        df = read_dw_table(table_name, conn, columns)
+        text_columns = df.select_dtypes(include=["object", "string"]).columns
+        df = df.astype({column: "category" for column in text_columns})
         logger.info(f"{table_name} successfully loaded.\n")
         return df
     except Exception as e:
@@ -62,39 +273,365 @@ def ingest_dim_table(table_name: str) -> pd.DataFrame:
         raise
 
 
+def dimension_table_columns(dimensions: list) -> dict:
+    """
+    Return, per dimension table, the columns needed for the given dimensions.
+
+    Each list holds the table's key followed by the requested dimensions the
+    table contains (looked up with PRAGMA table_info), e.g.
+    {"dim_region": ["region_key", "region"], ...}.
+    """
+    table_columns = {}
+    for table_name, key in DIMENSION_TABLES.items():
+        available = {row[1] for row in _get_conn().execute(f"PRAGMA table_info({table_name})")}
+        table_columns[table_name] = [key] + [
+            dim for dim in dimensions if dim in available and dim != key
+        ]
+    return table_columns
+
+
+def _submit_dimension_loads(
+    pool: ThreadPoolExecutor, dimensions: list | None = None
+) -> dict[str, Future]:
+    """
+    Start loading every dimension table on the pool, one connection per load.
+
+    Only the columns for `dimensions` are read when given (see
+    dimension_table_columns). Returns the futures by table name.
+    """
+    if dimensions is None:
+        table_columns = dict.fromkeys(DIMENSION_TABLES)
+    else:
+        table_columns = dimension_table_columns(dimensions)
+    return {
+        table_name: pool.submit(_with_own_conn, ingest_dim_table, table_name, columns=columns)
+        for table_name, columns in table_columns.items()
+    }
+
+
+def _load_dimension_tables(dimensions: list | None = None) -> dict:
+    """Load the dimension tables in parallel (see _submit_dimension_loads)."""
+    with ThreadPoolExecutor(max_workers=len(DIMENSION_TABLES)) as pool:
+        futures = _submit_dimension_loads(pool, dimensions)
+        return {table_name: future.result() for table_name, future in futures.items()}
+
+
+@functools.lru_cache(maxsize=128)
+def _column_names(dimensions: tuple, metrics: tuple) -> tuple:
+    """Build the cube column names for a hashable (dimensions, metrics) key."""
+    column_names = dimensions + tuple(
+        f"{column}_{func}"
+        for column, agg_funcs in metrics
+        for func in (agg_funcs if isinstance(agg_funcs, tuple) else (agg_funcs,))
+    )
+    logger.info(f"Generated column names for OLAP cube: {list(column_names)}\n")
+    return column_names
+
+
 def generate_column_names(dimensions: list, metrics: dict) -> list:
     """
     Generate explicit column names for the OLAP cube based on dimensions and metrics.
+
+    Names are computed once per dimensions/metrics combination and cached,
+    since rollups and chunked cubes ask for the same names repeatedly.
+    """
+    return list(_column_names(*_cube_cache_key(dimensions, metrics)))
+
+
+def _rollup_metrics(metrics: dict) -> dict:
+    """
+    Return the metrics a leaf cube needs so every requested metric can be rolled up.
+
+    Sums, counts, minimums and maximums can be aggregated again; a mean
+    cannot, so it is replaced by the sum and count it is rebuilt from.
     """
-    column_names = dimensions.copy()
+    leaf_metrics = {}
     for column, agg_funcs in metrics.items():
-        if isinstance(agg_funcs, list):
-            for func in agg_funcs:
-                column_names.append(f"{column}_{func}")
-        else:
-            column_names.append(f"{column}_{agg_funcs}")
+        funcs: list = []
+        for func in agg_funcs if isinstance(agg_funcs, list) else [agg_funcs]:
+            needed = ["sum", "count"] if func == "mean" else [func]
+            for leaf_func in needed:
+                if leaf_func not in ROLLUP_AGGREGATES:
+                    raise ValueError(f"Aggregation '{func}' cannot be rolled up.")
+                if leaf_func not in funcs:
+                    funcs.append(leaf_func)
+        leaf_metrics[column] = funcs
+    return leaf_metrics
 
-    # Cleanup
-    column_names = [col.replace("__", "_").rstrip("_") for col in column_names]
 
-    logger.info(f"Generated column names for OLAP cube: {column_names}\n")
-    return column_names
+def _reaggregate(leaf: pd.DataFrame, kept: list, metrics: dict) -> pd.DataFrame:
+    """
+    Aggregate the cells of a leaf cube up to the `kept` dimensions.
+
+    The leaf cube holds the metrics returned by _rollup_metrics(metrics)
+    and so does the result; means are added separately by _add_means.
+    With no kept dimensions a single grand-total row is returned.
+    """
+    aggregations = {
+        f"{column}_{func}": ROLLUP_AGGREGATES[func]
+        for column, funcs in _rollup_metrics(metrics).items()
+        for func in funcs
+    }
+    if kept:
+        grouped = leaf.groupby(kept, observed=True, sort=False, as_index=False)
+        return grouped.agg(aggregations)
+    return pd.DataFrame({column: [leaf[column].agg(func)] for column, func in aggregations.items()})
+
+
+def _add_means(cube: pd.DataFrame, metrics: dict) -> pd.DataFrame:
+    """Add the requested mean columns to a cube, as sum / count."""
+    for column, agg_funcs in metrics.items():
+        if "mean" in (agg_funcs if isinstance(agg_funcs, list) else [agg_funcs]):
+            cube[f"{column}_mean"] = cube[f"{column}_sum"] / cube[f"{column}_count"]
+    return cube
+
+
+def rollup_cube(leaf: pd.DataFrame, dimensions: list, metrics: dict) -> pd.DataFrame:
+    """
+    Build the ROLLUP of a leaf cube, like SQL GROUP BY ROLLUP(dimensions).
+
+    The leaf cube must hold the metrics returned by _rollup_metrics(metrics).
+    Each coarser level, from (d1, ..., dn) down to the grand total (), is
+    aggregated from the leaf cells instead of the fact rows, so the cost
+    depends on the number of cells, not the number of rows.
+
+    Rolled-up dimensions are left empty, and grouping_id has one bit per
+    dimension (first dimension = highest bit) set when that dimension is
+    rolled up, like SQL GROUPING(). The leaf level has grouping_id 0.
+    """
+    metric_columns = generate_column_names(dimensions, metrics)[len(dimensions) :]
+
+    levels = []
+    for depth in range(len(dimensions), -1, -1):
+        level = _add_means(_reaggregate(leaf, dimensions[:depth], metrics), metrics)
+        # Empty rolled-up dimensions keep the leaf dtype, so concat does not
+        # have to guess one from all-NA columns
+        for dim in dimensions[depth:]:
+            level[dim] = pd.Series(pd.NA, index=level.index, dtype=leaf[dim].dtype)
+        level = level[dimensions + metric_columns]
+        level["grouping_id"] = (1 << (len(dimensions) - depth)) - 1
+        levels.append(level)
+
+    cube = pd.concat(levels, ignore_index=True)
+    logger.info(f"ROLLUP cube created with {len(levels)} levels over: {dimensions}\n")
+    return cube
 
 
-def create_olap_cube(data_df: pd.DataFrame, dimensions: list, metrics: dict) -> pd.DataFrame:
+def _group_sum_count_loop(
+    group_ids: np.ndarray, values: np.ndarray, n_groups: int, n_chunks: int
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Sum and count the non-NaN values of every column per group, in one pass.
+
+    Rows are split into n_chunks contiguous blocks, one per thread, and each
+    block accumulates into its own slice of the outputs, so threads never
+    write to the same cell. The caller adds the slices together. Rows with a
+    negative group id (a missing dimension) are skipped.
+
+    Returns per-block sums and counts, shaped (n_chunks, n_groups, n_columns),
+    and per-block row counts, shaped (n_chunks, n_groups).
+    """
+    n_rows, n_values = values.shape
+    sums = np.zeros((n_chunks, n_groups, n_values))
+    counts = np.zeros((n_chunks, n_groups, n_values), dtype=np.int64)
+    rows = np.zeros((n_chunks, n_groups), dtype=np.int64)
+    step = (n_rows + n_chunks - 1) // n_chunks
+    for c in prange(n_chunks):
+        for i in range(c * step, min(n_rows, (c + 1) * step)):
+            g = group_ids[i]
+            if g < 0:
+                continue
+            rows[c, g] += 1
+            for j in range(n_values):
+                v = values[i, j]
+                if not np.isnan(v):
+                    sums[c, g, j] += v
+                    counts[c, g, j] += 1
+    return sums, counts, rows
+
+
+_group_kernel = (
+    njit(parallel=True, nogil=True, cache=True)(_group_sum_count_loop) if njit is not None else None
+)
+
+
+def _group_sums_counts_bincount(
+    group_ids: np.ndarray, values: np.ndarray, n_groups: int
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Sum and count the non-NaN values of every column per group with np.bincount.
+
+    Same results as _group_sum_count_loop, without numba: the group id is
+    used directly as an array index, so no hash table is built. Rows with a
+    negative group id (a missing dimension) are skipped.
+
+    Returns sums and counts shaped (n_groups, n_columns) and row counts
+    shaped (n_groups,).
+    """
+    valid = group_ids >= 0
+    rows = np.bincount(group_ids[valid], minlength=n_groups)
+    sums = np.empty((n_groups, values.shape[1]))
+    counts = np.empty((n_groups, values.shape[1]), dtype=np.int64)
+    for j in range(values.shape[1]):
+        keep = valid & ~np.isnan(values[:, j])
+        sums[:, j] = np.bincount(group_ids[keep], weights=values[keep, j], minlength=n_groups)
+        counts[:, j] = np.bincount(group_ids[keep], minlength=n_groups)
+    return sums, counts, rows
+
+
+def _group_sums_counts_npg(
+    group_ids: np.ndarray, values: np.ndarray, n_groups: int
+) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Sum and count the non-NaN values of every column per group with numpy-groupies.
+
+    Same results as _group_sums_counts_bincount. npg.aggregate uses its
+    numba implementation when numba is installed; nansum/nanlen skip NaN
+    values without building a mask per column.
+    """
+    valid = group_ids >= 0
+    group_ids, values = group_ids[valid], values[valid]
+    rows = npg.aggregate(group_ids, 1, func="sum", size=n_groups)
+    sums = np.empty((n_groups, values.shape[1]))
+    counts = np.empty((n_groups, values.shape[1]), dtype=np.int64)
+    for j in range(values.shape[1]):
+        sums[:, j] = npg.aggregate(group_ids, values[:, j], func="nansum", size=n_groups)
+        counts[:, j] = npg.aggregate(group_ids, values[:, j], func="nanlen", size=n_groups)
+    return sums, counts, rows
+
+
+def _dense_cube_backend(data_df: pd.DataFrame, dimensions: list, metrics: dict) -> str | None:
+    """
+    Pick the dense aggregation path for create_olap_cube, if any.
+
+    Returns "numba" for large data marts when numba is installed and its
+    per-thread accumulators fit under DENSE_CUBE_MAX_GROUPS, otherwise "npg"
+    when numpy-groupies is installed and "bincount" when not. Returns None
+    when the metrics are not all sum/mean/count or there are too many
+    category combinations. The dimensions must already be categories.
+    """
+    for agg_funcs in metrics.values():
+        if not set(agg_funcs if isinstance(agg_funcs, list) else [agg_funcs]) <= DENSE_AGGREGATES:
+            return None
+    n_groups = int(np.prod([len(data_df[dim].cat.categories) for dim in dimensions]))
+    if not 0 < n_groups <= DENSE_CUBE_MAX_GROUPS:
+        return None
+    if (
+        _group_kernel is not None
+        and len(data_df) >= NUMBA_CUBE_MIN_ROWS
+        and n_groups * get_num_threads() <= DENSE_CUBE_MAX_GROUPS
+    ):
+        return "numba"
+    if npg is not None:
+        return "npg"
+    return "bincount"
+
+
+def _create_olap_cube_dense(
+    data_df: pd.DataFrame, dimensions: list, metrics: dict, backend: str
+) -> pd.DataFrame:
+    """
+    Aggregate sum/mean/count metrics per dimension combination on dense group ids.
+
+    The category codes of the dimensions are combined into one group id
+    with np.ravel_multi_index (mixed radix: the id space is exactly the
+    product of the category counts, so it can index arrays directly). Every
+    metric column is then summed and counted per group by the numba kernel,
+    numpy-groupies or np.bincount (backend), and the dimension values of the
+    observed groups are rebuilt with np.unravel_index. Groups come out sorted
+    by the dimension categories.
+    """
+    categories = [data_df[dim].cat.categories for dim in dimensions]
+    shape = tuple(len(cats) for cats in categories)
+    codes = [data_df[dim].cat.codes.to_numpy() for dim in dimensions]
+
+    missing = np.zeros(len(data_df), dtype=bool)
+    for dim_codes in codes:
+        missing |= dim_codes < 0
+    group_ids = np.ravel_multi_index(
+        [np.where(missing, 0, dim_codes) for dim_codes in codes], shape
+    ).astype(np.int64)
+    group_ids[missing] = -1
+
+    columns = list(metrics)
+    values = np.column_stack(
+        [data_df[column].to_numpy(dtype=np.float64, na_value=np.nan) for column in columns]
+    )
+    n_groups = int(np.prod(shape))
+    if backend == "numba":
+        sums, counts, rows = _group_kernel(group_ids, values, n_groups, get_num_threads())
+        sums, counts, rows = sums.sum(axis=0), counts.sum(axis=0), rows.sum(axis=0)
+    elif backend == "npg":
+        sums, counts, rows = _group_sums_counts_npg(group_ids, values, n_groups)
+    else:
+        sums, counts, rows = _group_sums_counts_bincount(group_ids, values, n_groups)
+
+    # Only combinations that occur in the data, like groupby(observed=True)
+    observed = np.flatnonzero(rows)
+    cube = pd.DataFrame(
+        {
+            dim: pd.Categorical.from_codes(dim_codes, categories=cats)
+            for dim, dim_codes, cats in zip(
+                dimensions, np.unravel_index(observed, shape), categories, strict=True
+            )
+        }
+    )
+    for j, (column, agg_funcs) in enumerate(metrics.items()):
+        group_sums, group_counts = sums[observed, j], counts[observed, j]
+        for func in agg_funcs if isinstance(agg_funcs, list) else [agg_funcs]:
+            if func == "sum":
+                cube[f"{column}_{func}"] = group_sums
+            elif func == "count":
+                cube[f"{column}_{func}"] = group_counts
+            else:
+                cube[f"{column}_{func}"] = np.divide(
+                    group_sums,
+                    group_counts,
+                    out=np.full(len(observed), np.nan),
+                    where=group_counts > 0,
+                )
+    return cube
+
+
+def create_olap_cube(
+    data_df: pd.DataFrame, dimensions: list, metrics: dict, rollup: bool = False
+) -> pd.DataFrame:
     """
     Create an OLAP cube by aggregating data across multiple dimensions.
 
     - dimensions: list of categorical columns (age_group, smoker, bmi_category, region, etc.)
     - metrics: dictionary of measures, e.g.: {"charges": ["sum", "mean"], "fact_key": "count"}
+    - rollup: also add every ROLLUP level, derived from the leaf cube (see rollup_cube)
+
+    Dimensions are grouped as categories, so pandas hashes integer codes;
+    only combinations that occur in the data are kept (observed=True) and
+    groups are left in order of appearance (sort=False). All metrics are
+    computed in one groupby().agg() call.
+
+    When every metric is sum/mean/count and the dimensions have few category
+    combinations, the groupby is replaced by direct indexing on dense group
+    ids: a parallel numba kernel for large data marts (when numba is
+    installed), numpy-groupies or np.bincount otherwise. Groups then come
+    out sorted by the dimensions.
     """
     if data_df.empty:
         logger.warning("Input DataFrame is empty, cannot create cube.\n")
         return pd.DataFrame()
 
+    if rollup:
+        leaf = create_olap_cube(data_df, dimensions, _rollup_metrics(metrics))
+        return rollup_cube(leaf, dimensions, metrics)
+
     try:
-        grouped = data_df.groupby(dimensions, dropna=True)
-        cube = grouped.agg(metrics).reset_index()
+        data_df = data_df.astype({dim: "category" for dim in dimensions})
+        backend = _dense_cube_backend(data_df, dimensions, metrics)
+        if backend is not None:
+            cube = _create_olap_cube_dense(data_df, dimensions, metrics, backend)
+        else:
+            grouped = data_df.groupby(
+                dimensions, dropna=True, observed=True, sort=False, as_index=False
+            )
+            cube = grouped.agg(metrics)
 
         explicit_columns = generate_column_names(dimensions, metrics)
         cube.columns = explicit_columns
@@ -109,16 +646,492 @@ def create_olap_cube(data_df: pd.DataFrame, dimensions: list, metrics: dict) ->
         raise
 
 
+def _metrics_to_sql(metrics: dict) -> list:
+    """
+    Translate a metrics dictionary into SQL aggregate expressions.
+
+    For example {"charges": ["sum", "mean"]} becomes
+    ["SUM(f.charges) AS charges_sum", "AVG(f.charges) AS charges_mean"].
+    Metric columns are read from the fact table (alias f).
+    """
+    expressions = []
+    for column, agg_funcs in metrics.items():
+        for func in agg_funcs if isinstance(agg_funcs, list) else [agg_funcs]:
+            if func not in SQL_AGGREGATES:
+                raise ValueError(f"Aggregation '{func}' is not supported in SQL cubes.")
+            expressions.append(f"{SQL_AGGREGATES[func]}(f.{column}) AS {column}_{func}")
+    return expressions
+
+
+def _cube_cache_key(dimensions: list, metrics: dict) -> tuple:
+    """Return a hashable key for a dimensions/metrics combination."""
+    return (
+        tuple(dimensions),
+        tuple(
+            (column, tuple(funcs) if isinstance(funcs, list) else funcs)
+            for column, funcs in metrics.items()
+        ),
+    )
+
+
+def _build_cube_sql(dimensions: list, metrics: dict, rollup: bool = False) -> str:
+    """
+    Build the SQL that joins the DW tables and aggregates them into a cube.
+
+    With rollup=True the query uses GROUP BY ROLLUP and adds grouping_id
+    (see rollup_cube); SQLite does not support this, DuckDB does.
+
+    There is no ORDER BY: every engine leaves groups unsorted and main()
+    sorts the finished cube once before writing it.
+    """
+    dimension_list = ", ".join(dimensions)
+    joins = "\n".join(f"LEFT JOIN {table} USING ({key})" for table, key in DIMENSION_TABLES.items())
+    # Rows without a matching dimension are dropped, like groupby(dropna=True)
+    not_null = " AND ".join(f"{dim} IS NOT NULL" for dim in dimensions)
+    select = [dimension_list, *_metrics_to_sql(metrics)]
+    group_by = dimension_list
+    if rollup:
+        select.append(f"GROUPING({dimension_list}) AS grouping_id")
+        group_by = f"ROLLUP ({dimension_list})"
+
+    return f"""
+        SELECT {", ".join(select)}
+        FROM fact_insurance_charges AS f
+        {joins}
+        WHERE {not_null}
+        GROUP BY {group_by}
+    """
+
+
+def _cube_sql(dimensions: list, metrics: dict) -> str:
+    """
+    Return the cube query for a dimensions/metrics combination.
+
+    The SQL is built once per combination and kept in _stmt_cache.
+    Passing the identical string to the shared connection also lets
+    sqlite3 reuse its prepared statement instead of parsing and planning
+    the query again. The query plan is logged the first time a
+    combination is seen.
+    """
+    key = _cube_cache_key(dimensions, metrics)
+    if key in _stmt_cache:
+        return _stmt_cache[key]
+
+    sql = _build_cube_sql(dimensions, metrics)
+    plan = _get_conn().execute(f"EXPLAIN QUERY PLAN {sql}").fetchall()
+    logger.info(
+        f"Query plan for cube {list(dimensions)}:\n" + "\n".join(f"  {row[-1]}" for row in plan)
+    )
+    _stmt_cache[key] = sql
+    return sql
+
+
+def create_olap_cube_from_dw(dimensions: list, metrics: dict, rollup: bool = False) -> pd.DataFrame:
+    """
+    Create an OLAP cube by letting SQLite join and aggregate the DW tables.
+
+    Same result as create_olap_cube() on the joined fact + dimension tables,
+    but only the aggregated rows cross from SQLite into pandas.
+
+    - dimensions: columns of the dimension tables (age_group, smoker, bmi_category, region, etc.)
+    - metrics: dictionary of fact-table measures,
+      e.g.: {"charges": ["sum", "mean"], "fact_key": "count"}
+    - rollup: also add every ROLLUP level (see rollup_cube). SQLite has no
+      GROUPING SETS, so the leaf cube is queried once and rolled up in pandas.
+    """
+    if rollup:
+        leaf = create_olap_cube_from_dw(dimensions, _rollup_metrics(metrics))
+        return rollup_cube(leaf, dimensions, metrics)
+
+    try:
+        cube = pd.read_sql_query(_cube_sql(dimensions, metrics), _get_conn())
+    except sqlite3.OperationalError as e:
+        logger.error(f"Error running OLAP cube query against {DB_PATH}: {e}")
+        raise
+
+    cube.columns = generate_column_names(dimensions, metrics)
+    logger.info(f"OLAP cube created in SQLite with dimensions: {dimensions}\n")
+    return cube
+
+
+def create_olap_cube_duckdb(dimensions: list, metrics: dict, rollup: bool = False) -> pd.DataFrame:
+    """
+    Create an OLAP cube with DuckDB's parallel, vectorized hash aggregate.
+
+    The DW tables are loaded with read_dw_table() (so the Parquet cache is
+    used) and registered in an in-memory DuckDB connection without copying,
+    then the same query as create_olap_cube_from_dw() runs on them. DuckDB
+    supports GROUP BY ROLLUP, so rollup=True is done in the query itself.
+
+    Reading the SQLite file directly (ATTACH ... TYPE SQLITE) would need
+    DuckDB's sqlite extension, which is downloaded on first use.
+
+    Requires the optional `duckdb` package (pip install analytics-project[perf]).
+    """
+    if duckdb is None:
+        raise ImportError("engine='duckdb' requires duckdb: pip install analytics-project[perf]")
+
+    con = duckdb.connect()
+    try:
+        for table_name in ["fact_insurance_charges", *DIMENSION_TABLES]:
+            con.register(table_name, read_dw_table(table_name))
+        cube = con.execute(_build_cube_sql(dimensions, metrics, rollup=rollup)).df()
+    finally:
+        con.close()
+
+    cube.columns = generate_column_names(dimensions, metrics) + (["grouping_id"] if rollup else [])
+    logger.info(f"OLAP cube created in DuckDB with dimensions: {dimensions}\n")
+    return cube
+
+
+def scan_dw_table_polars(table_name: str, columns: list | None = None) -> "pl.LazyFrame":
+    """
+    Return a Polars LazyFrame over a DW table.
+
+    A fresh Parquet cache (see read_dw_table) is scanned lazily, so Polars
+    only reads the columns and rows the query needs. Otherwise the columns
+    are read from SQLite through the shared connection.
+    """
+    cache_path = DW_CACHE_DIR / f"{table_name}.parquet"
+    if _cache_is_fresh(cache_path):
+        return pl.scan_parquet(cache_path)
+    column_list = ", ".join(columns) if columns else "*"
+    return pl.read_database(
+        f"SELECT {column_list} FROM {table_name}", connection=_get_conn()
+    ).lazy()
+
+
+def create_olap_cube_polars(dimensions: list, metrics: dict, rollup: bool = False) -> pd.DataFrame:
+    """
+    Create an OLAP cube with Polars' lazy, multi-threaded join and group_by.
+
+    The fact table is left-joined to each dimension table on its key, rows
+    without a matching dimension are dropped (like groupby(dropna=True)),
+    and the metrics are aggregated per dimension combination. The whole
+    query is planned at once, so only the needed columns are read, and it
+    runs on Polars' streaming engine. Only the cube is converted to pandas.
+
+    - rollup: also add every ROLLUP level (see rollup_cube)
+
+    Requires the optional `polars` package (pip install analytics-project[perf]).
+    """
+    if pl is None:
+        raise ImportError("engine='polars' requires polars: pip install analytics-project[perf]")
+    if rollup:
+        leaf = create_olap_cube_polars(dimensions, _rollup_metrics(metrics))
+        return rollup_cube(leaf, dimensions, metrics)
+
+    aggregations = []
+    for column, agg_funcs in metrics.items():
+        for func in agg_funcs if isinstance(agg_funcs, list) else [agg_funcs]:
+            if func not in SQL_AGGREGATES:
+                raise ValueError(f"Aggregation '{func}' is not supported in Polars cubes.")
+            expr = getattr(pl.col(column), func)()
+            if func == "count":
+                expr = expr.cast(pl.Int64)
+            aggregations.append(expr.alias(f"{column}_{func}"))
+
+    # Keys are cast to Int64 on both sides: read_database infers a Null
+    # dtype for the columns of an empty table, which cannot be joined on
+    fact_columns = list(dict.fromkeys([*DIMENSION_TABLES.values(), *metrics]))
+    lf = (
+        scan_dw_table_polars("fact_insurance_charges", fact_columns)
+        .select(fact_columns)
+        .with_columns(pl.col(list(DIMENSION_TABLES.values())).cast(pl.Int64))
+    )
+    for table_name, columns in dimension_table_columns(dimensions).items():
+        key = DIMENSION_TABLES[table_name]
+        dim_lf = (
+            scan_dw_table_polars(table_name, columns)
+            .select(columns)
+            .with_columns(pl.col(key).cast(pl.Int64))
+        )
+        lf = lf.join(dim_lf, on=key, how="left")
+
+    cube = (
+        lf.drop_nulls(subset=dimensions)
+        .group_by(dimensions)
+        .agg(aggregations)
+        .collect(engine="streaming")
+        .to_pandas()
+    )
+    cube.columns = generate_column_names(dimensions, metrics)
+    logger.info(f"OLAP cube created in Polars with dimensions: {dimensions}\n")
+    return cube
+
+
+def write_cube(cube: pd.DataFrame, filename: str) -> None:
+    """
+    Save the OLAP cube to a Snappy-compressed Parquet file.
+
+    Parquet is columnar and keeps the column types (categories included),
+    so readers can load only the columns they need without re-parsing.
+    The file name gets a .parquet suffix.
+    """
+    output_path = OLAP_OUTPUT_DIR.joinpath(filename).with_suffix(".parquet")
+    cube.to_parquet(output_path, engine="pyarrow", compression="snappy", index=False)
+    logger.info(f"OLAP cube saved to {output_path}.\n")
+
+
 def write_cube_to_csv(cube: pd.DataFrame, filename: str) -> None:
     """
-    Save the OLAP cube to a CSV file.
+    Save the OLAP cube to a CSV file (for Power BI and other CSV readers).
     """
     output_path = OLAP_OUTPUT_DIR.joinpath(filename)
     cube.to_csv(output_path, index=False)
     logger.info(f"OLAP cube saved to {output_path}.\n")
 
 
-def main():
+def _matching_keys(dim_keys: np.ndarray, fact_keys: np.ndarray) -> np.ndarray:
+    """
+    Return a boolean mask of the fact keys that exist in dim_keys.
+
+    Surrogate keys are small, dense non-negative integers (1..n), so the
+    dimension keys are set in a bitmap indexed by key and each fact key is
+    a single array lookup: exact, unlike a Bloom filter, and without hashing.
+    Negative fact keys (missing) never match.
+    """
+    dim_keys = dim_keys[dim_keys >= 0]
+    size = int(dim_keys.max()) + 1 if dim_keys.size else 0
+    bitmap = np.zeros(size, dtype=bool)
+    bitmap[dim_keys] = True
+
+    in_range = (fact_keys >= 0) & (fact_keys < size)
+    matched = np.zeros(len(fact_keys), dtype=bool)
+    matched[in_range] = bitmap[fact_keys[in_range]]
+    return matched
+
+
+def add_dimension_columns(
+    fact_df: pd.DataFrame, dim_tables: dict, dimensions: list | None = None
+) -> pd.DataFrame:
+    """
+    Look up dimension columns for each fact row through its surrogate keys.
+
+    - dim_tables: dimension DataFrames by table name (see DIMENSION_TABLES)
+    - dimensions: see build_data_mart
+
+    Fact rows whose key is not in the dimension table are found first with
+    a key bitmap (see _matching_keys); they get empty values without a
+    lookup, and only the matched rows are mapped.
+    """
+    for table_name, key in DIMENSION_TABLES.items():
+        dim_df = dim_tables[table_name].set_index(key)
+        fact_keys = fact_df[key]
+        matched = _matching_keys(
+            dim_df.index.to_numpy(dtype=np.int64),
+            fact_keys.to_numpy(dtype=np.int64, na_value=-1),
+        )
+        unmatched = len(matched) - int(matched.sum())
+        if unmatched:
+            logger.info(f"{unmatched} fact rows have no row in {table_name}.")
+            fact_keys = fact_keys[matched]
+
+        for column in dim_df.columns:
+            if dimensions is not None and column not in dimensions:
+                continue
+            name = column
+            if column in fact_df.columns:
+                name = f"{column}_{table_name.removeprefix('dim_')}"
+            values = fact_keys.map(dim_df[column])
+            fact_df[name] = values.reindex(fact_df.index) if unmatched else values
+    return fact_df
+
+
+def create_olap_cube_chunked(
+    dimensions: list,
+    metrics: dict,
+    chunksize: int = FACT_CHUNK_SIZE,
+    rollup: bool = False,
+) -> pd.DataFrame:
+    """
+    Create an OLAP cube in pandas while streaming the fact table in chunks.
+
+    The (small) dimension tables are loaded once. Each fact chunk gets its
+    dimension columns, is aggregated into a partial cube, and is merged into
+    the running cube; means are only computed at the end from sums and
+    counts. Memory holds one chunk plus the cube, not the whole data mart.
+
+    - rollup: also add every ROLLUP level (see rollup_cube)
+    """
+    leaf_metrics = _rollup_metrics(metrics)
+    if rollup:
+        leaf = create_olap_cube_chunked(dimensions, leaf_metrics, chunksize)
+        return rollup_cube(leaf, dimensions, metrics)
+
+    dim_tables = _load_dimension_tables(dimensions)
+    fact_columns = list(dict.fromkeys([*DIMENSION_TABLES.values(), *metrics]))
+    cube = None
+    for chunk in ingest_fact_insurance_from_dw(chunksize=chunksize, columns=fact_columns):
+        chunk = add_dimension_columns(chunk, dim_tables, dimensions)
+        partial = create_olap_cube(chunk, dimensions, leaf_metrics)
+        if partial.empty:
+            continue  # no rows in this chunk, nothing to merge
+        if cube is None:
+            cube = partial
+        else:
+            cube = _reaggregate(pd.concat([cube, partial], ignore_index=True), dimensions, metrics)
+
+    if cube is None:
+        logger.warning("Fact table is empty, cannot create cube.\n")
+        return pd.DataFrame()
+
+    cube = _add_means(cube, metrics)
+    return cube[generate_column_names(dimensions, metrics)]
+
+
+def count_unmatched_facts(conn: sqlite3.Connection | None = None) -> int:
+    """
+    Count fact rows whose keys have no matching row in a dimension table.
+
+    Such rows get empty dimension values and are left out of the cube. The
+    check runs as one anti-join query in SQLite, so no table is loaded.
+    """
+    joins = "\n".join(f"LEFT JOIN {table} USING ({key})" for table, key in DIMENSION_TABLES.items())
+    unmatched = " OR ".join(f"{table}.{key} IS NULL" for table, key in DIMENSION_TABLES.items())
+    sql = f"""
+        SELECT COUNT(*)
+        FROM fact_insurance_charges AS f
+        {joins}
+        WHERE {unmatched}
+    """
+    return (conn or _get_conn()).execute(sql).fetchone()[0]
+
+
+def build_data_mart(
+    dimensions: list | None = None, fact_columns: list | None = None
+) -> pd.DataFrame:
+    """
+    Ingest the fact and dimension tables and join them into one DataFrame.
+
+    fact_insurance_charges contains:
+      demographics_key, region_key, risk_key, charges, age, bmi, children
+
+    Dimension tables are small and keyed by integer surrogate keys, so each
+    dimension column is looked up with Series.map on the fact key instead of
+    merging whole tables (no copies of the fact columns, no hash join).
+
+    - dimensions: dimension columns to add (e.g. age_group, region). All
+      dimension columns are added when None; a column whose name is already
+      in the fact table gets the table name as suffix (e.g. children_demographics).
+      When set, only those columns (and the keys) are read from the dimension tables.
+    - fact_columns: fact columns to read (must include the three keys); all when None.
+
+    The fact table and the dimension tables are loaded concurrently on a
+    thread pool; sqlite3 and the Parquet reader release the GIL while they
+    read, so the loads overlap.
+    """
+    with ThreadPoolExecutor(max_workers=len(DIMENSION_TABLES) + 1) as pool:
+        fact_future = pool.submit(
+            _with_own_conn, ingest_fact_insurance_from_dw, columns=fact_columns
+        )
+        dim_futures = _submit_dimension_loads(pool, dimensions)
+        dim_tables = {table_name: future.result() for table_name, future in dim_futures.items()}
+        fact_df = fact_future.result()
+    return add_dimension_columns(fact_df, dim_tables, dimensions)
+
+
+def _dw_version() -> str:
+    """
+    Return a token that changes whenever the DW file is written.
+
+    The token is the file's modification time (in ns) and size, as in
+    _cache_is_fresh. Any ETL reload or manual UPDATE changes it, and no
+    table is read to compute it.
+    """
+    stat = DB_PATH.stat()
+    return f"{stat.st_mtime_ns}:{stat.st_size}"
+
+
+def load_materialized_cube(dimensions: list, metrics: dict, dw_version: str) -> pd.DataFrame | None:
+    """
+    Return the leaf cube stored in MV_TABLE (in MV_DB_PATH), if it is still valid.
+
+    It is valid when mv_metadata says it was built for the same
+    dimensions/metrics from the given version of the DW file (see _dw_version).
+    Returns None otherwise (or when nothing was materialized yet).
+    """
+    if not MV_DB_PATH.exists():
+        return None
+
+    with contextlib.closing(sqlite3.connect(MV_DB_PATH)) as mv_conn:
+        try:
+            row = mv_conn.execute(
+                f"SELECT cube_key, dw_version FROM {MV_METADATA_TABLE} WHERE view_name = ?",
+                (MV_TABLE,),
+            ).fetchone()
+        except sqlite3.OperationalError:
+            return None  # no metadata table yet
+
+        expected = (repr(_cube_cache_key(dimensions, metrics)), dw_version)
+        if row is None or tuple(row) != expected:
+            return None
+
+        logger.info(f"Reusing materialized leaf cube {MV_TABLE}.\n")
+        return pd.read_sql_query(f"SELECT * FROM {MV_TABLE}", mv_conn, dtype_backend=DTYPE_BACKEND)
+
+
+def save_materialized_cube(
+    leaf: pd.DataFrame, dimensions: list, metrics: dict, dw_version: str
+) -> None:
+    """
+    Store a leaf cube in MV_TABLE and record what it was built from in mv_metadata.
+
+    dw_version is the version of the DW file the cube was computed from,
+    taken before computing it (see _dw_version). Both tables are in
+    MV_DB_PATH, so the DW file itself is left untouched. The metadata row
+    is removed before the cube is replaced and written after, so an
+    interrupted save is never mistaken for a valid view.
+    """
+    with contextlib.closing(sqlite3.connect(MV_DB_PATH)) as mv_conn:
+        with mv_conn:
+            mv_conn.execute(
+                f"""
+                CREATE TABLE IF NOT EXISTS {MV_METADATA_TABLE} (
+                    view_name  TEXT PRIMARY KEY,
+                    cube_key   TEXT NOT NULL,
+                    dw_version TEXT NOT NULL
+                )
+                """
+            )
+            mv_conn.execute(f"DELETE FROM {MV_METADATA_TABLE} WHERE view_name = ?", (MV_TABLE,))
+        leaf.to_sql(MV_TABLE, mv_conn, if_exists="replace", index=False)
+        with mv_conn:
+            mv_conn.execute(
+                f"INSERT INTO {MV_METADATA_TABLE} VALUES (?, ?, ?)",
+                (MV_TABLE, repr(_cube_cache_key(dimensions, metrics)), dw_version),
+            )
+    logger.info(f"Leaf cube materialized in {MV_TABLE} ({MV_DB_PATH}).\n")
+
+
+def compute_cube(
+    engine: str, dimensions: list, metrics: dict, chunksize: int | None = None
+) -> pd.DataFrame:
+    """
+    Compute a cube from the DW tables with the given engine (see main).
+    """
+    if engine == "sqlite":
+        return create_olap_cube_from_dw(dimensions, metrics)
+    if engine == "pandas" and chunksize is not None:
+        return create_olap_cube_chunked(dimensions, metrics, chunksize)
+    if engine == "pandas":
+        # Only the keys and the measured columns are read from the fact table
+        fact_columns = list(dict.fromkeys([*DIMENSION_TABLES.values(), *metrics]))
+        return create_olap_cube(build_data_mart(dimensions, fact_columns), dimensions, metrics)
+    if engine == "duckdb":
+        return create_olap_cube_duckdb(dimensions, metrics)
+    if engine == "polars":
+        return create_olap_cube_polars(dimensions, metrics)
+    raise ValueError(f"Unknown OLAP engine: {engine}")
+
+
+def main(
+    engine: str = "sqlite",
+    rollup: bool = False,
+    chunksize: int | None = None,
+    verify: bool = False,
+    force_refresh: bool = False,
+):
     """
     Execute the OLAP cubing process for P6 Goal:
     "Which patient groups generate the highest medical insurance costs?"
@@ -133,50 +1146,37 @@ def main():
     - charges_sum: total charges
     - charges_mean: average charge per patient
     - fact_key_count: number of rows (≈ number of patients)
-    """
-    logger.info("Starting OLAP Cubing process for P6 Goal (High-Cost Patient Groups)...\n")
 
-    # Step 1: Ingest fact + dimensions from the Insurance DW
-    fact_df = ingest_fact_insurance_from_dw()
-    demo_df = ingest_dim_table("dim_demographics")
-    region_df = ingest_dim_table("dim_region")
-    risk_df = ingest_dim_table("dim_risk")
-
-    # Step 2: Join tables to build the Data Mart for the cube
-    # fact_insurance_charges contains:
-    #   demographics_key, region_key, risk_key, charges, age, bmi, children
-
-    # Join demographics
-    merged_df = fact_df.merge(
-        demo_df,
-        on="demographics_key",
-        how="left",
-        suffixes=("", "_demo"),
-    )
+    engine selects where the cube is computed:
+    - "sqlite": SQLite joins and aggregates the DW tables (default)
+    - "pandas": the tables are loaded and joined in pandas, then grouped
+    - "duckdb": DuckDB aggregates the DW tables (optional duckdb package)
+    - "polars": Polars joins and aggregates the DW tables lazily (optional polars package)
 
-    # Join region
-    merged_df = merged_df.merge(
-        region_df,
-        on="region_key",
-        how="left",
-        suffixes=("", "_region"),
-    )
+    With engine="pandas" and chunksize set, the fact table is streamed in
+    chunks of that many rows and aggregated incrementally
+    (see create_olap_cube_chunked).
 
-    # Join risk
-    final_df = merged_df.merge(
-        risk_df,
-        on="risk_key",
-        how="left",
-        suffixes=("", "_risk"),
-    )
+    With verify=True, fact rows that do not match a dimension table are
+    counted first (see count_unmatched_facts) and reported as a warning.
 
-    if final_df.isnull().any().any():
-        logger.warning(
-            "Merged DataFrame contains NaN values (missing dimension rows or keys). "
-            "This may happen if some fact rows do not match dimension tables.\n"
-        )
+    With rollup=True every ROLLUP level is added (see rollup_cube) and the
+    cube is saved as insurance_multidimensional_olap_cube_rollup.csv.
+
+    The engine only computes the leaf cube (sums and counts per dimension
+    combination), which is materialized as mv_insurance_cube_leaf in
+    insurance_mv.db, next to the DW. Later runs reuse it without scanning
+    the fact table while the DW file is unchanged (see
+    load_materialized_cube), unless force_refresh is True. The output cube
+    and its rollup levels are derived from it. An empty fact table gives an
+    empty cube (with its columns) and a warning.
+    """
+    if engine not in OLAP_ENGINES:
+        raise ValueError(f"Unknown OLAP engine: {engine}")
 
-    # Step 3: Define dimensions and metrics (aligned with P6)
+    logger.info("Starting OLAP Cubing process for P6 Goal (High-Cost Patient Groups)...\n")
+
+    # Step 1: Define dimensions and metrics (aligned with P6)
     dimensions = ["age_group", "smoker", "bmi_category", "region"]
 
     # Metrics: total + average charges, + number of rows (patients)
@@ -185,16 +1185,47 @@ def main():
         "fact_key": "count",
     }
 
-    # Step 4: Create the cube
-    olap_cube = create_olap_cube(final_df, dimensions, metrics)
+    if verify:
+        unmatched = count_unmatched_facts()
+        if unmatched:
+            logger.warning(
+                f"{unmatched} fact rows do not match a dimension table (missing "
+                "dimension rows or keys); they are left out of the cube.\n"
+            )
 
-    # Step 5: Save the cube to CSV
-    write_cube_to_csv(olap_cube, "insurance_multidimensional_olap_cube.csv")
+    # Step 2: Get the leaf cube, from the materialized view or the Insurance DW
+    leaf_metrics = _rollup_metrics(metrics)
+    dw_version = _dw_version()
+    leaf = None if force_refresh else load_materialized_cube(dimensions, leaf_metrics, dw_version)
+    if leaf is None:
+        leaf = compute_cube(engine, dimensions, leaf_metrics, chunksize)
+        if leaf.empty:
+            logger.warning("No fact rows to aggregate, the cube will be empty.\n")
+            leaf = pd.DataFrame(columns=generate_column_names(dimensions, leaf_metrics))
+        else:
+            save_materialized_cube(leaf, dimensions, leaf_metrics, dw_version)
 
-    logger.info("OLAP Cubing process completed successfully.\n")
-    logger.info(
-        f"Output saved to {OLAP_OUTPUT_DIR / 'insurance_multidimensional_olap_cube.csv'}\n"
+    # Derive the requested cube (and rollup levels) from the leaf cells
+    if rollup:
+        olap_cube = rollup_cube(leaf, dimensions, metrics)
+    else:
+        olap_cube = _add_means(leaf, metrics)[generate_column_names(dimensions, metrics)]
+
+    # Sort once, for stable output files (engines leave groups unsorted)
+    sort_keys = (["grouping_id"] if rollup else []) + dimensions
+    olap_cube = olap_cube.sort_values(sort_keys, ignore_index=True)
+
+    # Step 3: Save the cube to Parquet, plus a CSV copy
+    output_name = (
+        "insurance_multidimensional_olap_cube_rollup"
+        if rollup
+        else "insurance_multidimensional_olap_cube"
     )
+    write_cube(olap_cube, f"{output_name}.parquet")
+    write_cube_to_csv(olap_cube, f"{output_name}.csv")
+
+    logger.info("OLAP Cubing process completed successfully.\n")
+    logger.info(f"Output saved to {OLAP_OUTPUT_DIR / output_name}.parquet/.csv\n")
 
 
 if __name__ == "__main__":